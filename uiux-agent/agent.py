@@ -10,14 +10,31 @@ Supports multiple LLM providers: Anthropic (Claude), OpenAI (GPT), Google (Gemin
 """
 import asyncio
 import argparse
+import functools
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Optional, Union
 from dotenv import load_dotenv
 
+try:
+    import uvloop  # Optional: faster event loop (pip install fixitmany[fast])
+except ImportError:
+    uvloop = None
+
 # Load environment variables from .env file
 load_dotenv(Path(__file__).parent / ".env")
 
-from tools import TOOLS, read_file, list_files, write_file, search_web, fetch_url
-from providers import get_provider, LLMProvider
+from tools import (
+    TOOLS, read_file, list_files, write_file, search_web, fetch_url,
+    close_client, validate_tool_input, clear_listing_cache
+)
+from providers import (
+    get_provider, close_clients, openai_embedder, LLMCache, LLMProvider, TextBlock, ToolUseBlock
+)
 
 SYSTEM_PROMPT = """You are a UI/UX Research Agent specialized in web development.
 
@@ -34,7 +51,7 @@ When given a task, follow this process:
 1. **Understand the project** - Use list_files to see the structure
 2. **Read existing code** - Use read_file to examine current implementation
 3. **Research solutions** - Use search_web to find modern approaches, patterns, and solutions
-4. **Deep dive if needed** - Use fetch_url to read relevant articles or documentation
+4. **Deep dive if needed** - Use fetch_url to read relevant articles or documentation (fetch_urls reads several at once)
 5. **Synthesize and deliver** - Provide specific recommendations with code
 
 ## Your Personality
@@ -53,14 +70,102 @@ Always end your response with:
 
 When improving components, write the improved version to a new file using write_file."""
 
-async def execute_tool(name: str, input_data: dict) -> str:
-    """Execute a tool and return the result."""
+# Network tools whose results are memoized in-process (LRU). Entries expire
+# after TOOL_CACHE_TTL seconds so a long session still sees fresh results
+CACHEABLE_TOOLS = {"search_web", "fetch_url"}
+TOOL_CACHE_SIZE = 512
+TOOL_CACHE_TTL = 300
+_tool_cache: "OrderedDict[tuple[str, str], tuple[float, str]]" = OrderedDict()
+
+# Token budget for a single tool result. Every result is re-sent on each
+# later iteration, so one oversized result inflates every subsequent call.
+MAX_TOKENS_PER_RESULT = 4000
+CHARS_PER_TOKEN = 4  # Cheap estimate; avoids running a tokenizer
+
+# Repeated read-only calls within a run reuse the first call's result; this
+# many repeats in a row (or a tool-use turn repeating the previous one's text
+# and calls) ends the run
+MAX_DUPLICATE_CALLS = 3
+
+# Results that may succeed on retry; never cached or reused
+TRANSIENT_ERROR_PREFIXES = ("Search error:", "Fetch error:")
+
+
+def _truncate_result(result: str, limit: int = MAX_TOKENS_PER_RESULT * CHARS_PER_TOKEN) -> str:
+    """Trim a result over the token budget (in characters), keeping its head and tail."""
+    if len(result) <= limit:
+        return result
+    head = limit * 4 // 5
+    tail = limit - head
+    omitted = len(result) - head - tail
+    return f"{result[:head]}\n\n...[TRUNCATED {omitted} characters]...\n\n{result[-tail:]}"
+
+
+def _tool_cache_key(name: str, input_data: dict[str, Any]) -> tuple[str, str]:
+    """Build a cache key that ignores key order and surrounding whitespace."""
+    normalized = {
+        k: v.strip() if isinstance(v, str) else v
+        for k, v in input_data.items()
+    }
+    return (name, json.dumps(normalized, sort_keys=True))
+
+
+async def execute_tool(name: str, input_data: dict[str, Any], use_cache: bool = True) -> str:
+    """Execute a tool and return the result, reusing cached network results."""
+    # Report malformed calls back to the LLM instead of failing the loop
+    error = validate_tool_input(name, input_data)
+    if error:
+        return f"Invalid input for {name}: {error}. Check the tool's input schema and try again."
+
+    if name == "fetch_urls":
+        return await _fetch_urls(input_data["urls"], use_cache)
+
+    if not use_cache or name not in CACHEABLE_TOOLS:
+        return _truncate_result(await _run_tool(name, input_data))
+
+    key = _tool_cache_key(name, input_data)
+    cached = _tool_cache.get(key)
+    if cached is not None:
+        expires_at, result = cached
+        if expires_at > time.monotonic():
+            _tool_cache.move_to_end(key)
+            return result
+        del _tool_cache[key]
+
+    result = _truncate_result(await _run_tool(name, input_data))
+    # Don't cache failures - a retry may succeed
+    if not result.startswith(TRANSIENT_ERROR_PREFIXES):
+        _tool_cache[key] = (time.monotonic() + TOOL_CACHE_TTL, result)
+        if len(_tool_cache) > TOOL_CACHE_SIZE:
+            _tool_cache.popitem(last=False)
+    return result
+
+
+async def _fetch_urls(urls: list[str], use_cache: bool) -> str:
+    """Fetch several pages concurrently, each through the fetch_url cache."""
+    urls = list(dict.fromkeys(url.strip() for url in urls))
+    # The shared client multiplexes these over HTTP/2, so the batch takes
+    # about as long as the slowest page instead of the sum of all of them
+    pages = await asyncio.gather(*(execute_tool("fetch_url", {"url": url}, use_cache) for url in urls))
+    # Split the result budget between pages so later pages aren't cut off
+    limit = MAX_TOKENS_PER_RESULT * CHARS_PER_TOKEN // len(urls)
+    result = "\n\n".join(f"## {url}\n{_truncate_result(text, limit)}" for url, text in zip(urls, pages))
+    # A batch where every page failed is as retryable as a failed fetch_url
+    if all(page.startswith(TRANSIENT_ERROR_PREFIXES) for page in pages):
+        return f"Fetch error: every page failed\n\n{result}"
+    return result
+
+
+async def _run_tool(name: str, input_data: dict[str, Any]) -> str:
+    """Dispatch a tool call to its implementation."""
+    # File tools are synchronous; run them in a worker thread so they don't
+    # block network tools executing concurrently on the event loop.
     if name == "read_file":
-        return read_file(input_data["file_path"])
+        return await asyncio.to_thread(read_file, input_data["file_path"])
     elif name == "list_files":
-        return list_files(input_data["directory"], input_data.get("extension"))
+        return await asyncio.to_thread(list_files, input_data["directory"], input_data.get("extension"))
     elif name == "write_file":
-        return write_file(input_data["file_path"], input_data["content"])
+        return await asyncio.to_thread(write_file, input_data["file_path"], input_data["content"])
     elif name == "search_web":
         return await search_web(input_data["query"])
     elif name == "fetch_url":
@@ -69,11 +174,21 @@ async def execute_tool(name: str, input_data: dict) -> str:
         return f"Unknown tool: {name}"
 
 
+def _flush_output(lines: list[str]) -> None:
+    """Write buffered verbose lines in one write and flush."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+        lines.clear()
+
+
 async def run_agent(
     user_message: str,
     project_path: str = ".",
     verbose: bool = True,
-    provider: LLMProvider = None
+    provider: Optional[LLMProvider] = None,
+    use_cache: bool = True,
+    max_context_turns: Optional[int] = None
 ) -> str:
     """
     Run the agent loop until completion.
@@ -83,6 +198,9 @@ async def run_agent(
         project_path: Path to the project directory
         verbose: Whether to print tool usage details
         provider: LLM provider instance (defaults to Anthropic)
+        use_cache: Whether to reuse cached search_web/fetch_url results
+        max_context_turns: If set, only the most recent N tool-use turns are
+            re-sent to the LLM (the original task is always kept)
 
     Returns:
         The agent's final response
@@ -90,89 +208,212 @@ async def run_agent(
     if provider is None:
         provider = get_provider('anthropic')
 
-    messages = [
+    # The project may have changed since the last run (interactive mode)
+    clear_listing_cache()
+
+    messages: list[dict[str, Any]] = [
         {
             "role": "user",
             "content": f"Project directory: {project_path}\n\nTask: {user_message}"
         }
     ]
 
+    # Verbose lines are buffered and written once per phase of each iteration
+    output: list[str] = []
+
     if verbose:
-        print(f"\n{'='*60}")
-        print(f"UI/UX RESEARCH AGENT")
-        print(f"{'='*60}")
-        print(f"Provider: {provider.get_model_name()}")
-        print(f"Task: {user_message[:100]}{'...' if len(user_message) > 100 else ''}")
-        print(f"Project: {project_path}")
-        print(f"{'='*60}\n")
+        output.append(f"\n{'='*60}")
+        output.append(f"UI/UX RESEARCH AGENT")
+        output.append(f"{'='*60}")
+        output.append(f"Provider: {provider.get_model_name()}")
+        output.append(f"Task: {user_message[:100]}{'...' if len(user_message) > 100 else ''}")
+        output.append(f"Project: {project_path}")
+        output.append(f"{'='*60}\n")
 
     iteration = 0
 
+    # Loop detection: read-only calls made so far, keyed like the tool cache.
+    # Cleared on write_file since a write can change what a read returns.
+    seen_tool_calls: dict[tuple[str, str], "asyncio.Task[str]"] = {}
+    duplicate_calls = 0
+    last_turn_hash: Optional[str] = None
+
+    def forget_failed(key: tuple[str, str], task: "asyncio.Task[str]") -> None:
+        # A failed or cancelled call is retried for real the next time
+        if task.cancelled() or task.exception() is not None \
+                or task.result().startswith(TRANSIENT_ERROR_PREFIXES):
+            if seen_tool_calls.get(key) is task:
+                del seen_tool_calls[key]
+
     while True:  # No iteration limit - agent runs until complete
         iteration += 1
 
         if verbose:
-            print(f"[Iteration {iteration}] Thinking...")
-
-        # Call LLM via provider
-        response = provider.chat(
-            messages=messages,
-            system=SYSTEM_PROMPT,
-            tools=TOOLS
-        )
+            output.append(f"[Iteration {iteration}] Thinking...")
+            _flush_output(output)
+
+        # Read-only tool calls are started as soon as their block is
+        # complete, while the rest of the response is still streaming in.
+        # write_file runs in a worker thread that cancel() can't stop, so it
+        # (and every call after it in the turn) is held back as None until
+        # the turn is known to end in tool_use
+        tool_tasks: list[tuple[ToolUseBlock, Optional["asyncio.Task[str]"]]] = []
+
+        def start_call(block: ToolUseBlock) -> "asyncio.Task[str]":
+            nonlocal duplicate_calls
+            # Invalid input gets its error message from execute_tool; it can't
+            # be keyed (it may not even be a dict, and unknown tools have no
+            # validator to say so) so it isn't deduplicated
+            if block.name == "write_file" or not isinstance(block.input, dict) \
+                    or validate_tool_input(block.name, block.input):
+                if block.name == "write_file":
+                    seen_tool_calls.clear()
+                return asyncio.ensure_future(execute_tool(block.name, block.input, use_cache))
+            key = _tool_cache_key(block.name, block.input)
+            if key in seen_tool_calls:
+                duplicate_calls += 1
+                return seen_tool_calls[key]
+            duplicate_calls = 0
+            task = asyncio.ensure_future(execute_tool(block.name, block.input, use_cache))
+            seen_tool_calls[key] = task
+            task.add_done_callback(functools.partial(forget_failed, key))
+            return task
+
+        def on_block(block: Union[TextBlock, ToolUseBlock]) -> None:
+            if not isinstance(block, ToolUseBlock):
+                return
+            if verbose:
+                output.append(f"  > Tool: {block.name}")
+                # Truncate input display
+                input_str = str(block.input)
+                if len(input_str) > 100:
+                    input_str = input_str[:100] + "..."
+                output.append(f"    Input: {input_str}")
+                _flush_output(output)
+            deferred = block.name == "write_file" or any(task is None for _, task in tool_tasks)
+            tool_tasks.append((block, None if deferred else start_call(block)))
+
+        # Call LLM via provider, handing each block over as soon as it is complete
+        content: list[Union[TextBlock, ToolUseBlock]] = []
+        stop_reason: Optional[str] = None
+        try:
+            async for delta in provider.stream_chat(messages, SYSTEM_PROMPT, TOOLS):
+                if delta.block is not None:
+                    content.append(delta.block)
+                    on_block(delta.block)
+                if delta.stop_reason is not None:
+                    stop_reason = delta.stop_reason
+        finally:
+            # Started tool calls are only used if the turn ends in tool_use
+            if stop_reason != "tool_use":
+                for _, task in tool_tasks:
+                    if task is not None:
+                        task.cancel()
+        response: dict[str, Any] = {'content': content, 'stop_reason': stop_reason}
 
         # Check if we're done (no more tool calls)
         if response['stop_reason'] == "end_turn":
             final_text = ""
             for block in response['content']:
-                if hasattr(block, "text"):
+                if isinstance(block, TextBlock):
                     final_text += block.text
 
             if verbose:
-                print(f"\n{'='*60}")
-                print("AGENT COMPLETE")
-                print(f"{'='*60}\n")
+                output.append(f"\n{'='*60}")
+                output.append("AGENT COMPLETE")
+                output.append(f"{'='*60}\n")
+                _flush_output(output)
 
             return final_text
 
+        # Stop if the model is going in circles instead of paying for
+        # more iterations that can't make progress. Short narration like
+        # "Let me look at the file." repeats legitimately, so a turn only
+        # counts as repeated if its tool calls repeat too.
+        turn = [[b.text] if isinstance(b, TextBlock) else [b.name, b.input] for b in response['content']]
+        turn_hash = hashlib.sha1(json.dumps(turn, sort_keys=True, default=str).encode()).hexdigest()
+        repeated_turn = turn_hash == last_turn_hash
+        last_turn_hash = turn_hash
+        if response['stop_reason'] == "tool_use" and (
+            repeated_turn or duplicate_calls >= MAX_DUPLICATE_CALLS
+        ):
+            for _, task in tool_tasks:
+                if task is not None:
+                    task.cancel()
+            if verbose:
+                output.append(f"\n{'='*60}")
+                output.append("AGENT STOPPED: repeated tool calls detected")
+                output.append(f"{'='*60}\n")
+                _flush_output(output)
+            # Mid-run narration isn't an answer; report the stop instead
+            return "Agent stopped: repeated tool calls detected"
+
         # Process tool calls
         if response['stop_reason'] == "tool_use":
             # Add assistant's response to messages
             messages.append({"role": "assistant", "content": response['content']})
 
-            # Execute each tool call
+            # Tool calls run concurrently, except that a write_file waits for
+            # the calls before it and the calls after it wait for the write;
+            # results keep the call order
+            tool_blocks = [block for block, _ in tool_tasks]
+            tasks: list["asyncio.Task[str]"] = []
+            for block, task in tool_tasks:
+                if task is None:
+                    if block.name == "write_file":
+                        if tasks:
+                            await asyncio.wait(tasks)
+                        task = start_call(block)
+                        await asyncio.wait([task])
+                    else:
+                        task = start_call(block)
+                tasks.append(task)
+            results = await asyncio.gather(*tasks)
+
             tool_results = []
-            for block in response['content']:
-                if hasattr(block, 'type') and block.type == "tool_use":
-                    if verbose:
-                        print(f"  > Tool: {block.name}")
-                        # Truncate input display
-                        input_str = str(block.input)
-                        if len(input_str) > 100:
-                            input_str = input_str[:100] + "..."
-                        print(f"    Input: {input_str}")
-
-                    result = await execute_tool(block.name, block.input)
-
-                    if verbose:
-                        result_preview = result[:150] + "..." if len(result) > 150 else result
-                        print(f"    Result: {result_preview}\n")
-
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "tool_name": block.name,  # Include for Gemini compatibility
-                        "content": result
-                    })
+            for block, result in zip(tool_blocks, results):
+                if verbose:
+                    result_preview = result[:150] + "..." if len(result) > 150 else result
+                    output.append(f"  < {block.name}: {result_preview}\n")
+
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "tool_name": block.name,  # Include for Gemini compatibility
+                    "content": result
+                })
+
+            _flush_output(output)
 
             # Add tool results to messages
             messages.append({"role": "user", "content": tool_results})
+
+            # Drop the oldest assistant/tool-result pairs beyond the window
+            if max_context_turns:
+                while len(messages) > 1 + 2 * max_context_turns:
+                    del messages[1:3]
         else:
             # Unexpected stop reason
             return f"Agent stopped unexpectedly: {response['stop_reason']}"
 
 
-def main():
+def _shutdown_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Cancel leftover tasks, close the shared HTTP clients and close the loop."""
+    try:
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(close_client())
+        loop.run_until_complete(close_clients())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def main() -> None:
     parser = argparse.ArgumentParser(
         description="UI/UX Research Agent - Get fresh design ideas and solutions"
     )
@@ -206,51 +447,90 @@ def main():
         action="store_true",
         help="Run in interactive mode"
     )
+    parser.add_argument(
+        "--max-context-turns",
+        type=int,
+        metavar="N",
+        help="Only send the last N tool-use turns back to the LLM (default: unlimited)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-run web searches and URL fetches instead of reusing results"
+    )
+    parser.add_argument(
+        "--llm-cache",
+        metavar="FILE",
+        help="Answer repeated identical LLM requests from a response cache stored in FILE"
+    )
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="With --llm-cache, also reuse answers to near-identical tasks "
+             "(uses OpenAI embeddings; keep one cache file per project)"
+    )
 
     args = parser.parse_args()
 
     # Initialize provider
-    provider = get_provider(args.provider, args.model)
-
-    if args.interactive:
-        print(f"UI/UX Research Agent - Interactive Mode ({provider.get_model_name()})")
-        print("Type 'quit' to exit\n")
-
-        while True:
-            try:
-                task = input("You: ").strip()
-                if task.lower() in ['quit', 'exit', 'q']:
+    if args.semantic_cache and not args.llm_cache:
+        parser.error("--semantic-cache requires --llm-cache")
+    cache = None
+    if args.llm_cache:
+        cache = LLMCache(args.llm_cache, embed=openai_embedder() if args.semantic_cache else None)
+    provider = get_provider(args.provider, args.model, cache=cache)
+
+    # One event loop for the whole session so pooled HTTP connections are
+    # reused across interactive turns
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        if args.interactive:
+            print(f"UI/UX Research Agent - Interactive Mode ({provider.get_model_name()})")
+            print("Type 'quit' to exit\n")
+
+            while True:
+                try:
+                    task = input("You: ").strip()
+                    if task.lower() in ['quit', 'exit', 'q']:
+                        break
+                    if not task:
+                        continue
+
+                    result = loop.run_until_complete(run_agent(
+                        task,
+                        project_path=args.project,
+                        verbose=not args.quiet,
+                        provider=provider,
+                        use_cache=not args.no_cache,
+                        max_context_turns=args.max_context_turns
+                    ))
+                    print(f"\n{result}\n")
+                except KeyboardInterrupt:
+                    print("\nExiting...")
                     break
-                if not task:
-                    continue
-
-                result = asyncio.run(run_agent(
-                    task,
-                    project_path=args.project,
-                    verbose=not args.quiet,
-                    provider=provider
-                ))
-                print(f"\n{result}\n")
-            except KeyboardInterrupt:
-                print("\nExiting...")
-                break
-    else:
-        if not args.task:
-            # Default example task
-            task = """
-            Look at the current project and suggest improvements.
-            Focus on making the UI more modern and engaging.
-            """
         else:
-            task = args.task
-
-        result = asyncio.run(run_agent(
-            task,
-            project_path=args.project,
-            verbose=not args.quiet,
-            provider=provider
-        ))
-        print(result)
+            if not args.task:
+                # Default example task
+                task = """
+                Look at the current project and suggest improvements.
+                Focus on making the UI more modern and engaging.
+                """
+            else:
+                task = args.task
+
+            result = loop.run_until_complete(run_agent(
+                task,
+                project_path=args.project,
+                verbose=not args.quiet,
+                provider=provider,
+                use_cache=not args.no_cache,
+                max_context_turns=args.max_context_turns
+            ))
+            print(result)
+    finally:
+        _shutdown_loop(loop)
 
 
 if __name__ == "__main__":
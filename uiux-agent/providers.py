@@ -3,17 +3,122 @@ Multi-provider LLM support for the UI/UX Research Agent.
 Supports: Anthropic (Claude), OpenAI (GPT), Google (Gemini)
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Callable, Tuple, AsyncIterator, Union, Sequence, ClassVar, Mapping, Type
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import time
+
+try:
+    import orjson  # Optional: faster JSON codec (pip install fixitmany[fast])
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Seconds between status checks while waiting on a batch job
+BATCH_POLL_INTERVAL = 30
+
+# One independent request for chat_many(): (messages, system, tools)
+ChatJob = Tuple[List[Dict], str, Sequence[Dict]]
+
+
+def _json_loads(data):
+    """Parse JSON text or bytes, using orjson when installed."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize to compact JSON text, using orjson when installed."""
+    if orjson:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _json_canonical(obj: Any) -> bytes:
+    """Serialize with sorted keys for hashing and size estimates; unknown types become str()."""
+    if orjson:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, default=str, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# (tools object, its canonical JSON): the same tools are passed on every turn,
+# so cache keys and token estimates encode the schemas once instead of per call
+_canonical_tools_memo: Tuple[Optional[Sequence[Dict]], bytes] = (None, b"")
+
+
+def _canonical_tools(tools: Sequence[Dict]) -> bytes:
+    """_json_canonical(tools), reused while the same tools object is passed."""
+    global _canonical_tools_memo
+    if _canonical_tools_memo[0] is not tools:
+        _canonical_tools_memo = (tools, _json_canonical(tools))
+    return _canonical_tools_memo[1]
+
+
+# SDK clients shared by every provider instance of the same kind, so they
+# draw on one connection pool instead of each paying for new handshakes
+_shared_clients: Dict[str, Any] = {}
+
+
+def _shared_client(name: str, factory: Callable[[], Any]) -> Any:
+    client = _shared_clients.get(name)
+    if client is None:
+        client = _shared_clients[name] = factory()
+    return client
+
+
+async def close_clients() -> None:
+    """Close the shared SDK clients; call before the event loop closes."""
+    for name, client in list(_shared_clients.items()):
+        if name == "gemini":
+            await client.aio.aclose()
+        else:
+            await client.close()
+    _shared_clients.clear()
+    # Providers hold the closed clients; build new ones on next use
+    _providers.clear()
+
+
+def _convert_with_memo(messages: List[Dict], memo: Dict[int, Tuple[Dict, Any]], convert: Callable[[Dict], Any]) -> List:
+    """
+    Convert each message, reusing the result for message objects converted
+    on the previous call. The agent loop only appends to (or trims) its
+    history, so each turn only converts the new messages. Matching is by
+    identity: messages must not be edited in place after being sent.
+    """
+    results: List[Any] = []
+    seen: Dict[int, Tuple[Dict, Any]] = {}
+    for msg in messages:
+        entry = memo.get(id(msg))
+        # The stored message keeps its id from being reused by another object
+        if entry is None or entry[0] is not msg:
+            entry = (msg, convert(msg))
+        seen[id(msg)] = entry
+        results.append(entry[1])
+    memo.clear()
+    memo.update(seen)
+    return results
 
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Slotted all the way down (ABC itself has empty __slots__), so provider
+    # instances carry no per-instance __dict__
+    __slots__ = ()
+
+    # Model used when get_provider() is given none; set by concrete providers
+    DEFAULT_MODEL: ClassVar[str]
+
     @abstractmethod
-    def chat(self, messages: List[Dict], system: str, tools: List[Dict]) -> Dict[str, Any]:
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
         """
-        Send a chat request to the LLM.
+        Send a chat request to the LLM without blocking the event loop.
 
         Returns:
             Dict with keys:
@@ -22,6 +127,35 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator["ContentDelta"]:
+        """
+        Stream a response as ContentDelta items: text fragments as they are
+        generated, each content block once it is complete, and last the
+        stop reason.
+
+        The default implementation has no real streaming: it awaits achat()
+        and reports the blocks once it returns.
+        """
+        response = await self.achat(messages, system, tools)
+        for block in response['content']:
+            yield ContentDelta(block=block)
+        yield ContentDelta(stop_reason=response['stop_reason'])
+
+    async def chat_many(self, jobs: List[ChatJob]) -> List[Dict[str, Any]]:
+        """
+        Run independent requests and return their responses in job order.
+
+        Providers with a batch API submit all jobs as one batch, which is
+        cheaper but can take minutes to hours; the default just runs the
+        requests concurrently.
+        """
+        return list(await asyncio.gather(*(self.achat(*job) for job in jobs)))
+
     @abstractmethod
     def get_model_name(self) -> str:
         """Return the model name being used."""
@@ -31,37 +165,255 @@ class LLMProvider(ABC):
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude provider."""
 
-    def __init__(self, model: str = "claude-sonnet-4-20250514"):
-        from anthropic import Anthropic
-        self.client = Anthropic()
-        self.model = model
+    __slots__ = (
+        "client", "model", "_system_source", "_system_blocks",
+        "_tools_source", "_cacheable_tools", "_converted",
+    )
+
+    DEFAULT_MODEL = "claude-sonnet-4-20250514"
 
-    def chat(self, messages: List[Dict], system: str, tools: List[Dict]) -> Dict[str, Any]:
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            system=system,
-            tools=tools,
-            messages=messages
+    def __init__(self, model: str = DEFAULT_MODEL):
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+        super().__init__()
+        # HTTP/2 multiplexes concurrent requests over one connection
+        self.client = _shared_client(
+            "anthropic", lambda: AsyncAnthropic(http_client=DefaultAsyncHttpxClient(http2=True))
         )
+        self.model = model
+        self._system_source: Optional[str] = None
+        self._system_blocks: List[Dict] = []
+        self._converted: Dict[int, Tuple[Dict, Any]] = {}
+        self._tools_source: Optional[Sequence[Dict]] = None
+        self._cacheable_tools: List[Dict] = []
+
+    def _get_system_blocks(self, system: str) -> List[Dict]:
+        """Wrap the system prompt as a cacheable block, reusing it while unchanged."""
+        if system != self._system_source:
+            # Mark the system prompt as a cacheable prefix; it is identical
+            # on every turn of the agent loop
+            self._system_blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            self._system_source = system
+        return self._system_blocks
+
+    def _get_cacheable_tools(self, tools: Sequence[Dict]) -> List[Dict]:
+        """Copy tools with a cache breakpoint on the last one, reusing the copy while the same tools object is passed."""
+        if tools is not self._tools_source:
+            # Tools come first in the prompt, so this caches all of them
+            self._cacheable_tools = list(tools)
+            if tools:
+                self._cacheable_tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
+            self._tools_source = tools
+        return self._cacheable_tools
+
+    @staticmethod
+    def _convert_block_to_anthropic(block) -> Optional[Dict]:
+        """Convert a normalized content block or tool result to Anthropic's format."""
+        if isinstance(block, TextBlock):
+            # Anthropic rejects empty text blocks
+            return {"type": "text", "text": block.text} if block.text else None
+        if isinstance(block, ToolUseBlock):
+            return {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+        if isinstance(block, dict) and block.get("type") == "tool_result":
+            # Drop provider-specific extras such as tool_name
+            return {"type": "tool_result", "tool_use_id": block["tool_use_id"], "content": block["content"]}
+        return block
+
+    def _convert_messages_to_anthropic(self, messages: List[Dict]) -> List[Dict]:
+        """Convert normalized messages to Anthropic message params."""
+        anthropic_messages = _convert_with_memo(messages, self._converted, self._convert_message_to_anthropic)
+
+        # Breakpoint at the end of the conversation: the next turn only
+        # appends to it, so everything sent now is a cached prefix then.
+        # Copied so the memoized conversion stays unmarked.
+        if anthropic_messages:
+            last = anthropic_messages[-1]
+            content = last["content"]
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            if content:
+                anthropic_messages[-1] = {
+                    "role": last["role"],
+                    "content": [*content[:-1], {**content[-1], "cache_control": {"type": "ephemeral"}}]
+                }
+        return anthropic_messages
+
+    def _convert_message_to_anthropic(self, msg: Dict) -> Dict:
+        content = msg["content"]
+        if isinstance(content, list):
+            content = [
+                converted for converted in map(self._convert_block_to_anthropic, content)
+                if converted is not None
+            ]
+        return {"role": msg["role"], "content": content}
+
+    @staticmethod
+    def _convert_block_from_anthropic(block):
+        """Normalize an Anthropic SDK content block; other block types are dropped."""
+        if block.type == "text":
+            return TextBlock(text=block.text)
+        if block.type == "tool_use":
+            return ToolUseBlock(id=block.id, name=block.name, input=block.input)
+        return None
+
+    def _request_params(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": self._get_system_blocks(system),
+            "tools": self._get_cacheable_tools(tools),
+            "messages": self._convert_messages_to_anthropic(messages)
+        }
+
+    def _response_from_message(self, message) -> Dict[str, Any]:
+        content = [
+            block for block in map(self._convert_block_from_anthropic, message.content)
+            if block is not None
+        ]
         return {
-            'content': response.content,
-            'stop_reason': response.stop_reason
+            'content': content,
+            'stop_reason': message.stop_reason
         }
 
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        response = await self.client.messages.create(**self._request_params(messages, system, tools))
+        return self._response_from_message(response)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator["ContentDelta"]:
+        async with self.client.messages.stream(**self._request_params(messages, system, tools)) as stream:
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield ContentDelta(text=event.delta.text)
+                elif event.type == "content_block_stop":
+                    block = self._convert_block_from_anthropic(
+                        stream.current_message_snapshot.content[event.index]
+                    )
+                    if block is not None:
+                        yield ContentDelta(block=block)
+            message = await stream.get_final_message()
+        yield ContentDelta(stop_reason=message.stop_reason)
+
+    async def chat_many(self, jobs: List[ChatJob]) -> List[Dict[str, Any]]:
+        """Submit the jobs as one Message Batch and wait for it to finish."""
+        batch = await self.client.messages.batches.create(requests=[
+            {"custom_id": str(i), "params": self._request_params(*job)}
+            for i, job in enumerate(jobs)
+        ])
+        while batch.processing_status != "ended":
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        async for entry in await self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                raise RuntimeError(f"Batch {batch.id} request {entry.custom_id} {entry.result.type}")
+            responses[int(entry.custom_id)] = self._response_from_message(entry.result.message)
+        missing = [str(i) for i, response in enumerate(responses) if response is None]
+        if missing:
+            raise RuntimeError(f"Batch {batch.id} has no result for requests {', '.join(missing)}")
+        return [response for response in responses if response is not None]
+
     def get_model_name(self) -> str:
         return f"Anthropic/{self.model}"
 
 
+# A message's content: a plain prompt, or a list of blocks / tool results
+MessageContent = Union[str, List[Any]]
+
+
+def _openai_user_message(content: MessageContent, out: List[Dict]) -> None:
+    """Append a user message: a plain prompt, or one tool message per tool result."""
+    if isinstance(content, str):
+        out.append({"role": "user", "content": content})
+    elif isinstance(content, list):
+        # Tool messages take text; structured results are sent as JSON
+        out.extend(
+            {
+                "role": "tool",
+                "tool_call_id": item["tool_use_id"],
+                "content": item["content"] if isinstance(item["content"], str) else _json_dumps(item["content"])
+            }
+            for item in content
+            if item.get("type") == "tool_result"
+        )
+
+
+def _openai_assistant_message(content: MessageContent, out: List[Dict]) -> None:
+    """Append an assistant turn, folding its text and tool calls into one message."""
+    if not isinstance(content, list):
+        return
+    text_parts: List[str] = []
+    tool_calls: List[Dict] = []
+    for block in content:
+        if isinstance(block, TextBlock):
+            text_parts.append(block.text)
+        elif isinstance(block, ToolUseBlock):
+            tool_calls.append({
+                "id": block.id,
+                "type": "function",
+                "function": {
+                    "name": block.name,
+                    # OpenAI expects the arguments as a JSON string
+                    "arguments": block.input if isinstance(block.input, str) else _json_dumps(block.input)
+                }
+            })
+
+    assistant_msg: Dict[str, Any] = {"role": "assistant", "content": "".join(text_parts) or None}
+    if tool_calls:
+        assistant_msg["tool_calls"] = tool_calls
+    out.append(assistant_msg)
+
+
+_OPENAI_ROLE_HANDLERS = {
+    "user": _openai_user_message,
+    "assistant": _openai_assistant_message,
+}
+
+
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT provider."""
 
-    def __init__(self, model: str = "gpt-4.1"):
-        from openai import OpenAI
-        self.client = OpenAI()
+    __slots__ = (
+        "client", "model", "_tools_source", "_native_tools",
+        "_prompt_cache_source", "_prompt_cache_key", "_converted",
+    )
+
+    DEFAULT_MODEL = "gpt-4.1"
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+        super().__init__()
+        self.client = _shared_client(
+            "openai", lambda: AsyncOpenAI(http_client=DefaultAsyncHttpxClient(http2=True))
+        )
         self.model = model
+        self._tools_source: Optional[Sequence[Dict]] = None
+        self._native_tools: List[Dict] = []
+        self._prompt_cache_source: Optional[Tuple[str, Sequence[Dict]]] = None
+        self._prompt_cache_key = ""
+        self._converted: Dict[int, Tuple[Dict, Any]] = {}
+
+    def _get_openai_tools(self, tools: Sequence[Dict]) -> List[Dict]:
+        """Convert tools once and reuse the result while the same tools object is passed."""
+        if tools is not self._tools_source:
+            self._native_tools = self._convert_tools_to_openai(tools)
+            self._tools_source = tools
+        return self._native_tools
+
+    def _get_prompt_cache_key(self, system: str, tools: Sequence[Dict]) -> str:
+        """Name the static prefix so OpenAI routes requests sharing it to the same cache."""
+        if self._prompt_cache_source is None or self._prompt_cache_source[0] != system \
+                or self._prompt_cache_source[1] is not tools:
+            digest = hashlib.sha256(_json_dumps([system, tools]).encode()).hexdigest()
+            self._prompt_cache_key = f"{self.model}:{digest[:32]}"
+            self._prompt_cache_source = (system, tools)
+        return self._prompt_cache_key
 
-    def _convert_tools_to_openai(self, tools: List[Dict]) -> List[Dict]:
+    def _convert_tools_to_openai(self, tools: Sequence[Dict]) -> List[Dict]:
         """Convert Anthropic tool format to OpenAI function format."""
         return [
             {
@@ -77,62 +429,139 @@ class OpenAIProvider(LLMProvider):
 
     def _convert_messages_to_openai(self, messages: List[Dict], system: str) -> List[Dict]:
         """Convert Anthropic message format to OpenAI format."""
+        # The unchanged system message must stay first: OpenAI caches
+        # prompts automatically by longest identical prefix
         openai_messages = [{"role": "system", "content": system}]
+        for converted in _convert_with_memo(messages, self._converted, self._convert_message_to_openai):
+            openai_messages.extend(converted)
+        return openai_messages
 
-        for msg in messages:
-            if msg["role"] == "user":
-                if isinstance(msg["content"], str):
-                    openai_messages.append({"role": "user", "content": msg["content"]})
-                elif isinstance(msg["content"], list):
-                    # Tool results
-                    for item in msg["content"]:
-                        if item.get("type") == "tool_result":
-                            openai_messages.append({
-                                "role": "tool",
-                                "tool_call_id": item["tool_use_id"],
-                                "content": item["content"]
-                            })
-            elif msg["role"] == "assistant":
-                if isinstance(msg["content"], list):
-                    # Process assistant content with potential tool calls
-                    text_content = ""
-                    tool_calls = []
-
-                    for block in msg["content"]:
-                        if hasattr(block, 'text'):
-                            text_content += block.text
-                        elif hasattr(block, 'type') and block.type == "tool_use":
-                            tool_calls.append({
-                                "id": block.id,
-                                "type": "function",
-                                "function": {
-                                    "name": block.name,
-                                    "arguments": str(block.input) if not isinstance(block.input, str) else block.input
-                                }
-                            })
-
-                    assistant_msg = {"role": "assistant", "content": text_content or None}
-                    if tool_calls:
-                        assistant_msg["tool_calls"] = tool_calls
-                    openai_messages.append(assistant_msg)
+    @staticmethod
+    def _convert_message_to_openai(msg: Dict) -> List[Dict]:
+        """Convert one message; a user message with tool results becomes several."""
+        converted: List[Dict] = []
+        handler = _OPENAI_ROLE_HANDLERS.get(msg["role"])
+        if handler is not None:
+            handler(msg["content"], converted)
+        return converted
 
-        return openai_messages
+    def _request_params(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": self._convert_messages_to_openai(messages, system),
+            "tools": self._get_openai_tools(tools),
+            "max_tokens": 4096,
+            "prompt_cache_key": self._get_prompt_cache_key(system, tools)
+        }
+
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        response = await self.client.chat.completions.create(**self._request_params(messages, system, tools))
+        return self._response_from_completion(response)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator["ContentDelta"]:
+        stream = await self.client.chat.completions.create(
+            **self._request_params(messages, system, tools),
+            stream=True
+        )
+        text_parts = []
+        # The tool call currently streaming: [index, id, name, argument fragments]
+        call: Optional[List[Any]] = None
+        has_tool_calls = False
 
-    def chat(self, messages: List[Dict], system: str, tools: List[Dict]) -> Dict[str, Any]:
-        import json
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                text_parts.append(delta.content)
+                yield ContentDelta(text=delta.content)
+            for tc in delta.tool_calls or ():
+                # Fragments belong to calls by index; some compatible servers
+                # repeat the id on every chunk, so it can't mark a new call
+                index = tc.index if tc.index is not None else (call[0] if call else 0)
+                if call is None or index != call[0]:
+                    # A new call starts, so whatever came before it is complete
+                    if text_parts:
+                        yield ContentDelta(block=TextBlock(text="".join(text_parts)))
+                        text_parts.clear()
+                    if call is not None:
+                        yield ContentDelta(block=self._tool_use_from_parts(*call[1:]))
+                    call = [index, "", "", []]
+                    has_tool_calls = True
+                if tc.id and not call[1]:
+                    call[1] = tc.id
+                if tc.function:
+                    # The name arrives whole; skip it when a server repeats it
+                    if tc.function.name and tc.function.name != call[2]:
+                        call[2] += tc.function.name
+                    if tc.function.arguments:
+                        # Arguments arrive as JSON fragments; parsed once complete
+                        call[3].append(tc.function.arguments)
 
-        openai_messages = self._convert_messages_to_openai(messages, system)
-        openai_tools = self._convert_tools_to_openai(tools)
+        if call is not None:
+            yield ContentDelta(block=self._tool_use_from_parts(*call[1:]))
+        if text_parts:
+            yield ContentDelta(block=TextBlock(text="".join(text_parts)))
+        yield ContentDelta(stop_reason="tool_use" if has_tool_calls else "end_turn")
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=openai_messages,
-            tools=openai_tools,
-            max_tokens=4096
+    @staticmethod
+    def _tool_use_from_parts(call_id: str, name: str, arguments: List[str]) -> "ToolUseBlock":
+        joined = "".join(arguments)
+        return ToolUseBlock(id=call_id, name=name, input=_json_loads(joined) if joined else {})
+
+    async def chat_many(self, jobs: List[ChatJob]) -> List[Dict[str, Any]]:
+        """Submit the jobs through the Batch API and wait for it to finish."""
+        from openai.types.chat import ChatCompletion
+
+        lines = [
+            _json_dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._request_params(*job)
+            })
+            for i, job in enumerate(jobs)
+        ]
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode()),
+            purpose="batch"
         )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await self.client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} {batch.status}")
+
+        output = await self.client.files.content(batch.output_file_id)
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        for line in output.text.splitlines():
+            if not line:
+                continue
+            result = _json_loads(line)
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                raise RuntimeError(f"Batch {batch.id} request {result['custom_id']} failed: {result.get('error') or response.get('body')}")
+            completion = ChatCompletion.model_validate(response["body"])
+            responses[int(result["custom_id"])] = self._response_from_completion(completion)
+        missing = [str(i) for i, response in enumerate(responses) if response is None]
+        if missing:
+            # Failed requests are written to the error file, not the output
+            raise RuntimeError(f"Batch {batch.id} has no result for requests {', '.join(missing)}")
+        return [response for response in responses if response is not None]
 
+    def _response_from_completion(self, response) -> Dict[str, Any]:
         message = response.choices[0].message
-        content = []
+        content: List[Union[TextBlock, ToolUseBlock]] = []
 
         # Add text content if present
         if message.content:
@@ -144,7 +573,7 @@ class OpenAIProvider(LLMProvider):
                 content.append(ToolUseBlock(
                     id=tc.id,
                     name=tc.function.name,
-                    input=json.loads(tc.function.arguments)
+                    input=_json_loads(tc.function.arguments)
                 ))
 
         stop_reason = "tool_use" if message.tool_calls else "end_turn"
@@ -158,108 +587,284 @@ class OpenAIProvider(LLMProvider):
         return f"OpenAI/{self.model}"
 
 
+def _gemini_user_content(content: MessageContent, types: Any) -> Optional[Any]:
+    """Convert a user message: a plain prompt, or tool results as function responses."""
+    if isinstance(content, str):
+        return types.Content(role="user", parts=[types.Part(text=content)])
+    if isinstance(content, list):
+        parts = [
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name=item.get("tool_name", "unknown"),
+                    response={"result": item["content"]}
+                )
+            )
+            for item in content
+            if item.get("type") == "tool_result"
+        ]
+        if parts:
+            return types.Content(role="user", parts=parts)
+    return None
+
+
+def _gemini_model_content(content: MessageContent, types: Any) -> Optional[Any]:
+    """Convert an assistant turn's text and tool calls to a model message."""
+    if not isinstance(content, list):
+        return None
+    parts: List[Any] = []
+    for block in content:
+        if isinstance(block, TextBlock):
+            if block.text:
+                parts.append(types.Part(text=block.text))
+        elif isinstance(block, ToolUseBlock):
+            parts.append(types.Part(
+                function_call=types.FunctionCall(
+                    name=block.name,
+                    args=block.input
+                )
+            ))
+    return types.Content(role="model", parts=parts) if parts else None
+
+
+# JSON Schema type -> Gemini types.Type member name
+_GEMINI_TYPE_NAMES = {
+    "string": "STRING",
+    "integer": "INTEGER",
+    "number": "NUMBER",
+    "boolean": "BOOLEAN",
+    "array": "ARRAY",
+    "object": "OBJECT",
+}
+
+
+def _gemini_schema(schema: Dict, types: Any) -> Any:
+    """Convert a JSON Schema (sub)tree to a Gemini Schema, including nested arrays and objects."""
+    json_type = schema.get("type", "string")
+    nullable = False
+    if isinstance(json_type, list):
+        # e.g. ["string", "null"]
+        nullable = "null" in json_type
+        json_type = next((t for t in json_type if t != "null"), "string")
+
+    # Gemini only accepts enums on STRING, with string values
+    if "enum" in schema:
+        json_type = "string"
+    fields: Dict[str, Any] = {"type": types.Type(_GEMINI_TYPE_NAMES.get(json_type, "STRING"))}
+    if nullable:
+        fields["nullable"] = True
+    if "description" in schema:
+        fields["description"] = schema["description"]
+    if "enum" in schema:
+        fields["enum"] = [str(value) for value in schema["enum"] if value is not None]
+    if "items" in schema:
+        fields["items"] = _gemini_schema(schema["items"], types)
+    if "minItems" in schema:
+        fields["min_items"] = schema["minItems"]
+    if "maxItems" in schema:
+        fields["max_items"] = schema["maxItems"]
+    if "properties" in schema:
+        fields["properties"] = {
+            name: _gemini_schema(prop, types) for name, prop in schema["properties"].items()
+        }
+    if schema.get("required"):
+        fields["required"] = list(schema["required"])
+    return types.Schema(**fields)
+
+
+_GEMINI_ROLE_HANDLERS = {
+    "user": _gemini_user_content,
+    "assistant": _gemini_model_content,
+}
+
+
 class GeminiProvider(LLMProvider):
     """Google Gemini provider using the new google.genai SDK."""
 
-    def __init__(self, model: str = "gemini-2.5-pro"):
+    __slots__ = (
+        "client", "model_name", "_types", "_tools_source", "_native_tools",
+        "_cache_source", "_cache_name", "_cache_expires",
+        "_config_source", "_config", "_converted",
+    )
+
+    DEFAULT_MODEL = "gemini-2.5-pro"
+
+    # Lifetime of the server-side cache holding the system prompt and tools
+    CACHE_TTL = 3600
+
+    # Smallest prompt (in tokens) the API accepts for an explicit cache: 1024
+    # for Flash models, 4096 for Pro. Below it only implicit caching applies
+    # (automatic on 2.5+ models), so caches.create would just fail.
+    CACHE_MIN_TOKENS = {"flash": 1024}
+    CACHE_MIN_TOKENS_DEFAULT = 4096
+
+    def __init__(self, model: str = DEFAULT_MODEL):
         from google import genai
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
+        from google.genai import types
+        super().__init__()
+        self.client = _shared_client("gemini", lambda: genai.Client(
+            api_key=os.environ.get("GOOGLE_API_KEY"),
+            http_options=types.HttpOptions(async_client_args={"http2": True})
+        ))
+        # Imported once here rather than on every request
+        self._types = types
         self.model_name = model
+        self._tools_source: Optional[Sequence[Dict]] = None
+        self._native_tools: List = []
+        self._cache_source: Optional[Tuple[str, Sequence[Dict]]] = None
+        self._cache_name: Optional[str] = None
+        self._cache_expires = 0.0
+        self._config_source: Optional[Tuple[str, Sequence[Dict], Optional[str]]] = None
+        self._config: Any = None
+        self._converted: Dict[int, Tuple[Dict, Any]] = {}
 
-    def _convert_tools_to_gemini(self, tools: List[Dict]) -> List:
-        """Convert Anthropic tool format to Gemini format."""
-        from google.genai import types
+    def _get_gemini_tools(self, tools: Sequence[Dict]) -> List:
+        """Convert tools once and reuse the result while the same tools object is passed."""
+        if tools is not self._tools_source:
+            self._native_tools = self._convert_tools_to_gemini(tools)
+            self._tools_source = tools
+        return self._native_tools
 
-        function_declarations = []
-        for tool in tools:
-            # Convert JSON Schema to Gemini Schema format
-            schema = tool["input_schema"]
-            properties = {}
-            for prop_name, prop_def in schema.get("properties", {}).items():
-                prop_type = prop_def.get("type", "string").upper()
-                if prop_type == "STRING":
-                    properties[prop_name] = types.Schema(
-                        type=types.Type.STRING,
-                        description=prop_def.get("description", "")
-                    )
-                elif prop_type == "INTEGER":
-                    properties[prop_name] = types.Schema(
-                        type=types.Type.INTEGER,
-                        description=prop_def.get("description", "")
-                    )
-                elif prop_type == "BOOLEAN":
-                    properties[prop_name] = types.Schema(
-                        type=types.Type.BOOLEAN,
-                        description=prop_def.get("description", "")
+    def _get_config(self, system: str, tools: Sequence[Dict], cached_content: Optional[str] = None):
+        """Build the request config once and reuse it while system, tools and cache are unchanged."""
+        types = self._types
+
+        source = self._config_source
+        if source is None or source[0] != system or source[1] is not tools or source[2] != cached_content:
+            if cached_content:
+                # System instruction and tools already live in the cache
+                self._config = types.GenerateContentConfig(
+                    cached_content=cached_content,
+                    max_output_tokens=4096
+                )
+            else:
+                self._config = types.GenerateContentConfig(
+                    system_instruction=system,
+                    tools=self._get_gemini_tools(tools),
+                    max_output_tokens=4096
+                )
+            self._config_source = (system, tools, cached_content)
+        return self._config
+
+    async def _get_cached_content(self, system: str, tools: Sequence[Dict]) -> Optional[str]:
+        """
+        Return the name of a server-side cache holding the system prompt and
+        tools, creating it once per (system, tools) pair. Returns None when
+        they are below the model's minimum cacheable size.
+        """
+        from google.genai import errors
+        types = self._types
+
+        source = self._cache_source
+        if source is None or source[0] != system or source[1] is not tools \
+                or time.time() >= self._cache_expires:
+            self._cache_source = (system, tools)
+            self._cache_name = None
+            # Too small stays too small for this (system, tools) pair
+            self._cache_expires = float("inf")
+            # Rough 4 characters per token; the API has the final word below
+            estimated_tokens = (len(system) + len(_canonical_tools(tools))) // 4
+            if estimated_tokens < self._min_cache_tokens():
+                return None
+            try:
+                cache = await self.client.aio.caches.create(
+                    model=self.model_name,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system,
+                        tools=self._get_gemini_tools(tools),
+                        ttl=f"{self.CACHE_TTL}s"
                     )
+                )
+            except Exception as e:
+                if isinstance(e, errors.ClientError) and e.code == 400 \
+                        and "too small" in str(e.message).lower():
+                    return None
+                # The cache is only an optimisation: run this request uncached
+                # and try to create it again on the next call
+                self._cache_source = None
+                self._cache_expires = 0.0
+                logger.warning("Gemini cache creation failed, sending the request uncached: %s", e)
+                return None
+            self._cache_name = cache.name
+            # Recreate a little before the server drops it
+            self._cache_expires = time.time() + self.CACHE_TTL - 60
+        return self._cache_name
 
-            func_decl = types.FunctionDeclaration(
+    @staticmethod
+    def _is_missing_cache(error: Exception) -> bool:
+        """True for the 4xx the API returns when the cached content expired or was deleted."""
+        from google.genai import errors
+        return (
+            isinstance(error, errors.ClientError)
+            and error.code in (400, 403, 404)
+            and "cachedcontent" in str(error.message).lower().replace(" ", "").replace("_", "")
+        )
+
+    def _min_cache_tokens(self) -> int:
+        for family, minimum in self.CACHE_MIN_TOKENS.items():
+            if family in self.model_name:
+                return minimum
+        return self.CACHE_MIN_TOKENS_DEFAULT
+
+    def _convert_tools_to_gemini(self, tools: Sequence[Dict]) -> List:
+        """Convert Anthropic tool format to Gemini format."""
+        types = self._types
+
+        function_declarations = [
+            types.FunctionDeclaration(
                 name=tool["name"],
                 description=tool["description"],
-                parameters=types.Schema(
-                    type=types.Type.OBJECT,
-                    properties=properties,
-                    required=schema.get("required", [])
-                )
+                parameters=_gemini_schema({"type": "object", **tool["input_schema"]}, types)
             )
-            function_declarations.append(func_decl)
-
+            for tool in tools
+        ]
         return [types.Tool(function_declarations=function_declarations)]
 
-    def chat(self, messages: List[Dict], system: str, tools: List[Dict]) -> Dict[str, Any]:
-        from google.genai import types
+    def _build_contents(self, messages: List[Dict]) -> List:
+        return [
+            content for content in _convert_with_memo(messages, self._converted, self._convert_message_to_gemini)
+            if content is not None
+        ]
 
-        # Build contents list
-        contents = []
-        for msg in messages:
-            if msg["role"] == "user":
-                if isinstance(msg["content"], str):
-                    contents.append(types.Content(
-                        role="user",
-                        parts=[types.Part(text=msg["content"])]
-                    ))
-                elif isinstance(msg["content"], list):
-                    # Tool results
-                    parts = []
-                    for item in msg["content"]:
-                        if item.get("type") == "tool_result":
-                            parts.append(types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=item.get("tool_name", "unknown"),
-                                    response={"result": item["content"]}
-                                )
-                            ))
-                    if parts:
-                        contents.append(types.Content(role="user", parts=parts))
-            elif msg["role"] == "assistant":
-                if isinstance(msg["content"], list):
-                    parts = []
-                    for block in msg["content"]:
-                        if hasattr(block, 'text') and block.text:
-                            parts.append(types.Part(text=block.text))
-                        elif hasattr(block, 'type') and block.type == "tool_use":
-                            parts.append(types.Part(
-                                function_call=types.FunctionCall(
-                                    name=block.name,
-                                    args=block.input
-                                )
-                            ))
-                    if parts:
-                        contents.append(types.Content(role="model", parts=parts))
-
-        # Generate response
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                system_instruction=system,
-                tools=self._convert_tools_to_gemini(tools),
-                max_output_tokens=4096
-            )
+    def _convert_message_to_gemini(self, msg: Dict):
+        handler = _GEMINI_ROLE_HANDLERS.get(msg["role"])
+        return handler(msg["content"], self._types) if handler is not None else None
+
+    @staticmethod
+    def _tool_use_from_call(fc) -> "ToolUseBlock":
+        return ToolUseBlock(
+            id=f"gemini_{fc.name}_{id(fc)}",
+            name=fc.name,
+            input=dict(fc.args) if fc.args else {}
         )
 
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        contents = self._build_contents(messages)
+
+        # Generate response, with the static prefix from the cache if there is one
+        cached_content = await self._get_cached_content(system, tools)
+        response = None
+        if cached_content:
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=contents,
+                    config=self._get_config(system, tools, cached_content)
+                )
+            except Exception as e:
+                # Only a cache deleted server-side is retried uncached (and
+                # recreated next time); anything else is a real failure
+                if not self._is_missing_cache(e):
+                    raise
+                self._cache_source = None
+        if response is None:
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=self._get_config(system, tools)
+            )
+
         # Parse response
-        content = []
+        content: List[Union[TextBlock, ToolUseBlock]] = []
         has_function_calls = False
 
         if response.candidates and response.candidates[0].content:
@@ -268,12 +873,7 @@ class GeminiProvider(LLMProvider):
                     content.append(TextBlock(text=part.text))
                 elif part.function_call:
                     has_function_calls = True
-                    fc = part.function_call
-                    content.append(ToolUseBlock(
-                        id=f"gemini_{fc.name}_{id(fc)}",
-                        name=fc.name,
-                        input=dict(fc.args) if fc.args else {}
-                    ))
+                    content.append(self._tool_use_from_call(part.function_call))
 
         stop_reason = "tool_use" if has_function_calls else "end_turn"
 
@@ -282,44 +882,549 @@ class GeminiProvider(LLMProvider):
             'stop_reason': stop_reason
         }
 
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator["ContentDelta"]:
+        contents = self._build_contents(messages)
+        cached_content = await self._get_cached_content(system, tools)
+        if cached_content:
+            started = False
+            try:
+                async for delta in self._stream_response(contents, self._get_config(system, tools, cached_content)):
+                    started = True
+                    yield delta
+                return
+            except Exception as e:
+                # Same fallback as achat(), as long as nothing was streamed yet
+                if started or not self._is_missing_cache(e):
+                    raise
+                self._cache_source = None
+        async for delta in self._stream_response(contents, self._get_config(system, tools)):
+            yield delta
+
+    async def _stream_response(self, contents: List, config) -> AsyncIterator["ContentDelta"]:
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model_name,
+            contents=contents,
+            config=config
+        )
+        text_parts = []
+        has_function_calls = False
+        async for chunk in stream:
+            if not (chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts):
+                continue
+            for part in chunk.candidates[0].content.parts:
+                if part.text:
+                    text_parts.append(part.text)
+                    yield ContentDelta(text=part.text)
+                elif part.function_call:
+                    # Function calls arrive whole; text before one is complete
+                    if text_parts:
+                        yield ContentDelta(block=TextBlock(text="".join(text_parts)))
+                        text_parts.clear()
+                    has_function_calls = True
+                    yield ContentDelta(block=self._tool_use_from_call(part.function_call))
+        if text_parts:
+            yield ContentDelta(block=TextBlock(text="".join(text_parts)))
+        yield ContentDelta(stop_reason="tool_use" if has_function_calls else "end_turn")
+
     def get_model_name(self) -> str:
         return f"Google/{self.model_name}"
 
 
-# Simple data classes to standardize content blocks across providers
+# Simple data classes to standardize content blocks across providers.
+# Every provider's achat() returns these, so callers can dispatch with isinstance.
+@dataclass(slots=True)
 class TextBlock:
-    def __init__(self, text: str):
-        self.type = "text"
-        self.text = text
+    text: str
+    type: str = field(default="text", init=False)
 
 
+@dataclass(slots=True)
 class ToolUseBlock:
-    def __init__(self, id: str, name: str, input: Dict):
-        self.type = "tool_use"
-        self.id = id
-        self.name = name
-        self.input = input
+    id: str
+    name: str
+    input: Dict
+    type: str = field(default="tool_use", init=False)
+
+
+@dataclass(slots=True)
+class ContentDelta:
+    """One item of stream_chat(): a text fragment, a completed block, or the stop reason."""
+    text: str = ""
+    block: Any = None
+    stop_reason: Optional[str] = None
+
+
+def _block_to_dict(block) -> Any:
+    """Turn normalized blocks into plain dicts; other values pass through."""
+    if isinstance(block, (TextBlock, ToolUseBlock)):
+        return asdict(block)
+    return block
+
+
+def _block_from_dict(data: Dict):
+    """Rebuild a normalized block from _block_to_dict() output."""
+    if data["type"] == "tool_use":
+        return ToolUseBlock(id=data["id"], name=data["name"], input=data["input"])
+    return TextBlock(text=data["text"])
+
+
+def _normalize_vector(vector: List[float]) -> List[float]:
+    """Scale a vector to unit length so a dot product is its cosine similarity."""
+    norm = sum(x * x for x in vector) ** 0.5
+    return [x / norm for x in vector] if norm else list(vector)
+
+
+def openai_embedder(model: str = "text-embedding-3-small") -> Callable[[str], List[float]]:
+    """Return an embed function for LLMCache backed by OpenAI embeddings."""
+    from openai import OpenAI
+    client = OpenAI()
+
+    def embed(text: str) -> List[float]:
+        return client.embeddings.create(model=model, input=text).data[0].embedding
+
+    return embed
+
+
+class LLMCache:
+    """
+    Cache of LLM responses: an LRU with a TTL per entry.
+
+    Requests are matched exactly on (model, system, tools, messages). Only
+    useful because the providers never set a temperature, so a repeated
+    request is expected to get the same answer. With a path, entries are
+    loaded from and saved to a JSON file so they survive between runs.
+
+    With an embed function, a request that is a single user prompt can also
+    be answered by an earlier prompt whose embedding has cosine similarity
+    of at least `similarity`, as long as the model, system prompt and tools
+    are identical. Keep one cache per user/project: a near-duplicate prompt
+    gets another prompt's answer.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 256,
+        ttl: float = 3600,
+        embed: Optional[Callable[[str], List[float]]] = None,
+        similarity: float = 0.92
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity = similarity
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        # key -> (expires_at, response with blocks as dicts, scope, unit vector);
+        # scope and vector are only set for entries made from a single prompt
+        self._entries: "OrderedDict[str, tuple[float, Dict, Optional[str], Optional[List[float]]]]" = OrderedDict()
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                now = time.time()
+                for key, (expires_at, response, *semantic) in _json_loads(f.read()).items():
+                    if expires_at > now:
+                        scope, vector = semantic or (None, None)
+                        self._entries[key] = (expires_at, response, scope, vector)
+
+    @staticmethod
+    def _hash(model: str, system: str, tools: Sequence[Dict], messages: Optional[List[Dict]] = None) -> str:
+        """sha256 of the sorted-key JSON object of the given fields.
+
+        Streamed field by field so the tools' memoized encoding is reused; the
+        bytes hashed are exactly _json_canonical() of the whole object.
+        """
+        digest = hashlib.sha256(b"{")
+        if messages is not None:
+            digest.update(b'"messages":' + _json_canonical(messages) + b",")
+        digest.update(b'"model":' + _json_canonical(model))
+        digest.update(b',"system":' + _json_canonical(system))
+        digest.update(b',"tools":' + _canonical_tools(tools) + b"}")
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(model: str, system: str, tools: Sequence[Dict], messages: List[Dict]) -> str:
+        """Hash a request into a cache key."""
+        return LLMCache._hash(model, system, tools, [
+            {"role": msg["role"], "content": (
+                [_block_to_dict(block) for block in msg["content"]]
+                if isinstance(msg["content"], list) else msg["content"]
+            )}
+            for msg in messages
+        ])
+
+    @staticmethod
+    def make_scope(model: str, system: str, tools: Sequence[Dict]) -> str:
+        """Hash everything but the messages; similar prompts only match within a scope."""
+        return LLMCache._hash(model, system, tools)
+
+    def _live(self, key: str):
+        """Return key's entry if present and unexpired, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.time():
+            del self._entries[key]
+            entry = None
+        return entry
+
+    @staticmethod
+    def _decode(response: Dict) -> Dict[str, Any]:
+        return {
+            'content': [_block_from_dict(block) for block in response['content']],
+            'stop_reason': response['stop_reason']
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for key, or None on a miss."""
+        entry = self._live(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._decode(entry[1])
+
+    def get_similar(self, scope: str, vector: List[float]) -> Optional[Dict[str, Any]]:
+        """Return the response of the most similar prompt in scope, if close enough."""
+        vector = _normalize_vector(vector)
+        best_key, best_score = None, self.similarity
+        for key, (_, _, entry_scope, entry_vector) in self._entries.items():
+            if entry_scope == scope and entry_vector is not None:
+                score = sum(a * b for a, b in zip(vector, entry_vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+        if best_key is None:
+            return None
+        entry = self._live(best_key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self.semantic_hits += 1
+        self.misses -= 1  # Counted by the exact lookup that preceded this one
+        return self._decode(entry[1])
+
+    def set(
+        self,
+        key: str,
+        response: Dict[str, Any],
+        ttl: Optional[float] = None,
+        scope: Optional[str] = None,
+        vector: Optional[List[float]] = None
+    ) -> None:
+        """Store a response, evicting the least recently used entry if full."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, {
+            'content': [_block_to_dict(block) for block in response['content']],
+            'stop_reason': response['stop_reason']
+        }, scope, _normalize_vector(vector) if vector is not None else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            self._save(self.path)
+
+    def _save(self, path: str) -> None:
+        # Write to a temp file and swap it in so a crash can't leave half a file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_json_dumps(dict(self._entries)))
+        os.replace(tmp_path, path)
+
+
+class CachingProvider(LLMProvider):
+    """Wraps a provider and answers repeated requests from an LLMCache."""
+
+    __slots__ = ("provider", "cache")
+
+    def __init__(self, provider: LLMProvider, cache: LLMCache):
+        super().__init__()
+        self.provider = provider
+        self.cache = cache
 
+    async def _lookup(self, messages: List[Dict], system: str, tools: Sequence[Dict]):
+        """Probe the cache; returns (response or None, kwargs for LLMCache.set)."""
+        model = self.provider.get_model_name()
+        key = self.cache.make_key(model, system, tools, messages)
+        store: Dict[str, Any] = {"key": key}
+        response = self.cache.get(key)
+        # Later turns carry tool results, which must match exactly
+        if (response is None and self.cache.embed is not None
+                and len(messages) == 1 and isinstance(messages[0]["content"], str)):
+            scope = self.cache.make_scope(model, system, tools)
+            vector = await asyncio.to_thread(self.cache.embed, messages[0]["content"])
+            store.update(scope=scope, vector=vector)
+            response = self.cache.get_similar(scope, vector)
+        return response, store
 
-def get_provider(provider_name: str, model: Optional[str] = None) -> LLMProvider:
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        response, store = await self._lookup(messages, system, tools)
+        if response is None:
+            response = await self.provider.achat(messages, system, tools)
+            self.cache.set(response=response, **store)
+        return response
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator[ContentDelta]:
+        response, store = await self._lookup(messages, system, tools)
+        if response is not None:
+            for block in response['content']:
+                yield ContentDelta(block=block)
+            yield ContentDelta(stop_reason=response['stop_reason'])
+            return
+
+        content: List[Union[TextBlock, ToolUseBlock]] = []
+        async for delta in self.provider.stream_chat(messages, system, tools):
+            if delta.block is not None:
+                content.append(delta.block)
+            if delta.stop_reason is not None:
+                self.cache.set(response={'content': content, 'stop_reason': delta.stop_reason}, **store)
+            yield delta
+
+    async def chat_many(self, jobs: List[ChatJob]) -> List[Dict[str, Any]]:
+        lookups = [await self._lookup(*job) for job in jobs]
+        misses = [i for i, (response, _) in enumerate(lookups) if response is None]
+        responses = [response for response, _ in lookups]
+        if misses:
+            # Only the jobs that aren't cached go to the wrapped provider's batch
+            fresh = await self.provider.chat_many([jobs[i] for i in misses])
+            for i, response in zip(misses, fresh):
+                self.cache.set(response=response, **lookups[i][1])
+                responses[i] = response
+        return responses
+
+    def get_model_name(self) -> str:
+        return self.provider.get_model_name()
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "_lock")
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        # Waiters take tokens in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float) -> None:
+        # A request bigger than a minute's budget could otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimitedProvider(LLMProvider):
+    """
+    Wraps a provider so concurrent callers stay within the account's limits:
+    at most max_concurrency requests in flight, rpm requests and tpm input
+    tokens per minute. Callers wait instead of getting 429s.
+    """
+
+    __slots__ = ("provider", "_semaphore", "_rpm_bucket", "_tpm_bucket")
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: Optional[int] = None,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None
+    ):
+        super().__init__()
+        self.provider = provider
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._rpm_bucket = _TokenBucket(rpm) if rpm else None
+        self._tpm_bucket = _TokenBucket(tpm) if tpm else None
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict], system: str, tools: Sequence[Dict]) -> int:
+        # Rough 4 characters per token; close enough for pacing
+        # Same length as _json_canonical([system, tools, messages]): 2 brackets, 2 commas
+        size = len(_json_canonical(system)) + len(_canonical_tools(tools)) + len(_json_canonical(messages)) + 4
+        return size // 4
+
+    async def _wait_turn(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> None:
+        if self._rpm_bucket:
+            await self._rpm_bucket.acquire(1)
+        if self._tpm_bucket:
+            await self._tpm_bucket.acquire(self._estimate_tokens(messages, system, tools))
+
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        if self._semaphore is None:
+            await self._wait_turn(messages, system, tools)
+            return await self.provider.achat(messages, system, tools)
+        async with self._semaphore:
+            await self._wait_turn(messages, system, tools)
+            return await self.provider.achat(messages, system, tools)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict]
+    ) -> AsyncIterator[ContentDelta]:
+        if self._semaphore is None:
+            await self._wait_turn(messages, system, tools)
+            async for delta in self.provider.stream_chat(messages, system, tools):
+                yield delta
+            return
+        async with self._semaphore:
+            await self._wait_turn(messages, system, tools)
+            async for delta in self.provider.stream_chat(messages, system, tools):
+                yield delta
+
+    async def chat_many(self, jobs: List[ChatJob]) -> List[Dict[str, Any]]:
+        # Batch APIs have their own queueing and limits; only pace the
+        # fallback that fires one request per job
+        if type(self.provider).chat_many is not LLMProvider.chat_many:
+            return await self.provider.chat_many(jobs)
+        return await super().chat_many(jobs)
+
+    def get_model_name(self) -> str:
+        return self.provider.get_model_name()
+
+
+class MultiProvider(LLMProvider):
+    """
+    Sends each request to several providers at once. With "first" the
+    fastest successful response wins and the others are cancelled, so a
+    throttled or slow API doesn't hold the caller up. With "quorum" all
+    responses are awaited and the one most providers agree on is returned.
+    """
+
+    __slots__ = ("providers", "strategy")
+
+    def __init__(self, providers: List[LLMProvider], strategy: str = "first"):
+        super().__init__()
+        if not providers:
+            raise ValueError("MultiProvider needs at least one provider")
+        if strategy not in ("first", "quorum"):
+            raise ValueError(f"Unknown strategy: {strategy}. Choose from: ['first', 'quorum']")
+        self.providers = providers
+        self.strategy = strategy
+
+    async def achat(self, messages: List[Dict], system: str, tools: Sequence[Dict]) -> Dict[str, Any]:
+        return await self.achat_race(messages, system, tools, self.strategy)
+
+    async def achat_race(
+        self,
+        messages: List[Dict],
+        system: str,
+        tools: Sequence[Dict],
+        strategy: str = "first"
+    ) -> Dict[str, Any]:
+        """Query every provider concurrently and pick a response by strategy."""
+        tasks = [
+            asyncio.ensure_future(provider.achat(messages, system, tools))
+            for provider in self.providers
+        ]
+        if strategy == "quorum":
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return self._pick_majority(results)
+
+        pending = set(tasks)
+        error: BaseException = RuntimeError("No providers to race")
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exception = task.exception()
+                    if exception is None:
+                        return task.result()
+                    error = exception
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    @staticmethod
+    def _pick_majority(results: List[Any]) -> Dict[str, Any]:
+        """Return the response most providers gave; ties go to the earlier provider."""
+        groups: Dict[bytes, List[Dict[str, Any]]] = {}
+        error: BaseException = RuntimeError("No provider returned a response")
+        for result in results:
+            if isinstance(result, BaseException):
+                error = result
+                continue
+            # Compare what was said and which tools were called, not the
+            # provider-specific tool call ids
+            signature = _json_canonical([result['stop_reason']] + [
+                [block.text] if isinstance(block, TextBlock) else [block.name, block.input]
+                for block in result['content']
+            ])
+            groups.setdefault(signature, []).append(result)
+        if not groups:
+            raise error
+        return max(groups.values(), key=len)[0]
+
+    def get_model_name(self) -> str:
+        names = ", ".join(provider.get_model_name() for provider in self.providers)
+        return f"Multi[{self.strategy}]({names})"
+
+
+# Provider classes by name, fixed at import
+PROVIDERS: Mapping[str, Type[Union[AnthropicProvider, OpenAIProvider, GeminiProvider]]] = MappingProxyType({
+    'anthropic': AnthropicProvider,
+    'openai': OpenAIProvider,
+    'gemini': GeminiProvider,
+})
+
+# Base providers by (provider_name, model); wrappers are applied per call
+_providers: Dict[Tuple[str, str], LLMProvider] = {}
+
+
+def get_provider(
+    provider_name: str,
+    model: Optional[str] = None,
+    cache: Optional[LLMCache] = None,
+    max_concurrency: Optional[int] = None,
+    rpm: Optional[float] = None,
+    tpm: Optional[float] = None
+) -> LLMProvider:
     """
     Factory function to get the appropriate provider.
 
     Args:
         provider_name: 'anthropic', 'openai', or 'gemini'
         model: Optional model override
+        cache: Optional LLMCache; repeated identical requests are answered
+            from it instead of the API
+        max_concurrency: Optional cap on requests in flight at once
+        rpm: Optional requests-per-minute limit
+        tpm: Optional input-tokens-per-minute limit (estimated)
 
     Returns:
         LLMProvider instance
     """
-    providers = {
-        'anthropic': (AnthropicProvider, "claude-sonnet-4-20250514"),
-        'openai': (OpenAIProvider, "gpt-4.1"),
-        'gemini': (GeminiProvider, "gemini-2.5-pro"),
-    }
-
-    if provider_name not in providers:
-        raise ValueError(f"Unknown provider: {provider_name}. Choose from: {list(providers.keys())}")
+    if provider_name not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {provider_name}. Choose from: {list(PROVIDERS.keys())}")
 
-    provider_class, default_model = providers[provider_name]
-    return provider_class(model=model or default_model)
+    provider_class = PROVIDERS[provider_name]
+    model = model or provider_class.DEFAULT_MODEL
+    provider = _providers.get((provider_name, model))
+    if provider is None:
+        provider = _providers[(provider_name, model)] = provider_class(model=model)
+    if max_concurrency or rpm or tpm:
+        provider = RateLimitedProvider(provider, max_concurrency, rpm, tpm)
+    # Outermost, so cache hits don't use up the rate limits
+    if cache is not None:
+        provider = CachingProvider(provider, cache)
+    return provider
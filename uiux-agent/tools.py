@@ -1,129 +1,364 @@
 """
 Tools for the UI/UX Research Agent
 """
+import codecs
+import functools
+import html
 import os
+import re
 import httpx
 from bs4 import BeautifulSoup
-from pathlib import Path
+from itertools import islice
+from lxml import etree
 from typing import Optional
 
+# Shared HTTP client so connections (TCP/TLS) are reused across tool calls.
+# Created lazily because it must be bound to the running event loop.
+_client: Optional[httpx.AsyncClient] = None
+_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+_CLIENT_HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # HTTP/2 lets concurrent searches/fetches to one host share a connection
+        _client = httpx.AsyncClient(
+            http2=True, limits=_CLIENT_LIMITS, headers=_CLIENT_HEADERS, timeout=15.0
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client. Call before the event loop is closed."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Maximum characters of file content returned by read_file
+READ_TEXT_LIMIT = 10000
+
+
+@functools.lru_cache(maxsize=128)
+def _read_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Read and truncate a file; the stat fields in the key invalidate it on edits."""
+    # Read at most the bytes READ_TEXT_LIMIT + 1 UTF-8 characters can take,
+    # so a large build artifact is never loaded or decoded in full
+    with open(path_str, "rb") as f:
+        raw = f.read((READ_TEXT_LIMIT + 1) * 4)
+    # Universal newlines, as Path.read_text gave: \r\n and \r become \n
+    content = raw.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    # Limit content length to avoid token overflow
+    if len(content) > READ_TEXT_LIMIT:
+        return content[:READ_TEXT_LIMIT] + "\n\n... [truncated]"
+    return content
+
+
 def read_file(file_path: str) -> str:
     """Read a file from the project directory."""
     try:
-        path = Path(file_path)
-        if not path.exists():
+        path_str = os.path.abspath(file_path)
+        try:
+            st = os.stat(path_str)
+        except FileNotFoundError:
             return f"Error: File {file_path} not found"
-        content = path.read_text()
-        # Limit content length to avoid token overflow
-        if len(content) > 10000:
-            return content[:10000] + "\n\n... [truncated]"
-        return content
+        return _read_cached(path_str, st.st_mtime_ns, st.st_size)
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
 
+# list_files results keyed on (absolute directory, extension). write_file is
+# the agent's only way to change the tree, so it clears this; the agent also
+# clears it at the start of every run to pick up edits made in between.
+_listing_cache: dict = {}
+
+
+def clear_listing_cache() -> None:
+    """Forget memoized list_files results."""
+    _listing_cache.clear()
+
+
+# Common non-code directories; list_files never descends into these
+_SKIP_DIRS = frozenset({"node_modules", ".git", "__pycache__", ".next"})
+
+
+# Where supported (POSIX), walk by directory file descriptor: each child is
+# opened and stat()ed relative to its parent's fd (openat/fstatat) instead of
+# the kernel re-resolving the full path from the root for every entry
+_SCAN_BY_FD = os.scandir in os.supports_fd and os.open in os.supports_dir_fd
+
+
+def _scan(dirpath: str, rel_prefix: str, extension: Optional[str], dir_fd: Optional[int] = None):
+    """Lazily yield file paths under dirpath, relative to the listing root.
+
+    os.scandir's DirEntry carries the file type from the directory read, so
+    no per-entry stat() or Path object is needed, and skipped directories
+    are never descended into. Each directory's entries are visited in the
+    order their full paths sort (a subdirectory sorts as "name/"), so the
+    output is globally sorted and the caller can stop after the first N.
+    With _SCAN_BY_FD, dirpath is relative to dir_fd (the parent's fd).
+    """
+    # Unreadable directories are skipped rather than failing the whole
+    # listing, as Path.rglob did
+    try:
+        fd = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY, dir_fd=dir_fd) if _SCAN_BY_FD else None
+    except PermissionError:
+        return
+    try:
+        entries = []
+        try:
+            with os.scandir(dirpath if fd is None else fd) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            entries.append((entry.name + "/", entry))
+                    # Filter on the name first: a plain endswith, no Path parsing,
+                    # and rejected files never get an is_file() check or a sort key
+                    elif (extension is None or entry.name.endswith(extension)) and entry.is_file(follow_symlinks=False):
+                        entries.append((entry.name, entry))
+        except PermissionError:
+            return
+        entries.sort(key=lambda item: item[0])
+
+        for sort_name, entry in entries:
+            if sort_name[-1] == "/":
+                child = entry.path if fd is None else entry.name
+                yield from _scan(child, rel_prefix + sort_name, extension, fd)
+            else:
+                yield rel_prefix + sort_name
+    finally:
+        # Also runs when the caller stops early and the generator is closed
+        if fd is not None:
+            os.close(fd)
+
+
 def list_files(directory: str, extension: Optional[str] = None) -> str:
     """List files in a directory, optionally filtered by extension."""
+    # "tsx" means ".tsx", so the name match below can't hit "hosts"; an
+    # empty filter (models send "" for "none") lists every file
+    if extension:
+        extension = extension if extension.startswith(".") else "." + extension
+    else:
+        extension = None
+    key = (os.path.abspath(directory), extension)
+    cached = _listing_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        path = Path(directory)
-        if not path.exists():
+        if not os.path.isdir(directory):
             return f"Error: Directory {directory} not found"
 
-        files = []
-        for f in path.rglob("*"):
-            if f.is_file():
-                # Skip common non-code directories
-                if any(skip in str(f) for skip in ['node_modules', '.git', '__pycache__', '.next']):
-                    continue
-                if extension is None or f.suffix == extension:
-                    files.append(str(f.relative_to(path)))
-
-        return "\n".join(sorted(files)[:50])  # Limit to 50 files, sorted
+        # _scan yields in sorted order, so the walk stops after 50 files
+        listing = "\n".join(islice(_scan(directory, "", extension), 50))
+        _listing_cache[key] = listing
+        return listing
     except Exception as e:
         return f"Error listing files: {str(e)}"
 
 
+def _write_candidates(file_path: str):
+    """Yield file_path, then Component.new.tsx, Component.new2.tsx, ... for a Component.tsx path."""
+    yield file_path
+    # Add .new before the extension (e.g., Component.tsx -> Component.new.tsx)
+    directory, base = os.path.split(file_path)
+    stem, suffix = os.path.splitext(base)
+    yield os.path.join(directory, f"{stem}.new{suffix}")
+
+    # If .new also exists, add a number
+    counter = 2
+    while True:
+        yield os.path.join(directory, f"{stem}.new{counter}{suffix}")
+        counter += 1
+
+
 def write_file(file_path: str, content: str) -> str:
     """Write content to a file. Never overwrites existing files - creates new ones with .new suffix."""
     try:
-        path = Path(file_path)
-
-        # Never overwrite existing files
-        if path.exists():
-            # Add .new before the extension (e.g., Component.tsx -> Component.new.tsx)
-            stem = path.stem
-            suffix = path.suffix
-            new_path = path.parent / f"{stem}.new{suffix}"
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
 
-            # If .new also exists, add a number
-            counter = 2
-            while new_path.exists():
-                new_path = path.parent / f"{stem}.new{counter}{suffix}"
-                counter += 1
+        # Never overwrite existing files: O_EXCL creates the file only if it
+        # is missing, in one syscall and without a check-then-write race
+        for path in _write_candidates(file_path):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+                break
+            except FileExistsError:
+                continue
 
-            path = new_path
-
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        clear_listing_cache()
         return f"Successfully wrote to {path}"
     except Exception as e:
         return f"Error writing file: {str(e)}"
 
 
+# DuckDuckGo's HTML results: each title link, then the snippet link if the
+# result has one before the next title starts
+_RESULT_RE = re.compile(
+    r'class="result__a"[^>]*>(.*?)</a>'
+    r'(?:(?:(?!class="result__a").)*?class="result__snippet"[^>]*>(.*?)</a>)?',
+    re.DOTALL,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _strip_tags(fragment: str) -> str:
+    """Text of an HTML fragment, joined like BeautifulSoup's get_text(strip=True)."""
+    return "".join(html.unescape(piece).strip() for piece in _TAG_RE.split(fragment))
+
+
+def _soup_results(content: bytes) -> list:
+    """Parse (title, snippet) pairs with BeautifulSoup; slower but layout-tolerant."""
+    soup = BeautifulSoup(content, "lxml")
+    results = []
+    for result in soup.select(".result")[:5]:
+        title_elem = result.select_one(".result__title")
+        snippet_elem = result.select_one(".result__snippet")
+
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+            snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
+            results.append((title, snippet))
+    return results
+
+
 async def search_web(query: str) -> str:
     """Search the web for design inspiration and solutions."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                "https://html.duckduckgo.com/html/",
-                params={"q": query},
-                headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"},
-                timeout=10.0
-            )
-            soup = BeautifulSoup(response.text, "html.parser")
-            results = []
+    client = get_client()
+    try:
+        response = await client.get(
+            "https://html.duckduckgo.com/html/",
+            params={"q": query},
+            timeout=10.0
+        )
+        # One regex pass over the page; fall back to a full parse if the
+        # markup no longer matches
+        results = [
+            (_strip_tags(match.group(1)), _strip_tags(match.group(2) or ""))
+            for match in islice(_RESULT_RE.finditer(response.text), 5)
+        ] or _soup_results(response.content)
 
-            for result in soup.select(".result")[:5]:
-                title_elem = result.select_one(".result__title")
-                snippet_elem = result.select_one(".result__snippet")
+        if not results:
+            return "No results found"
+        return "\n".join(f"**{title}**\n{snippet}\n" for title, snippet in results)
+    except Exception as e:
+        return f"Search error: {str(e)}"
+
+
+# Maximum characters of page text returned by fetch_url
+FETCH_TEXT_LIMIT = 5000
+
+# Maximum bytes of a page downloaded by fetch_url
+FETCH_BYTE_LIMIT = 200_000
+
+# Elements whose text is page chrome or code rather than content
+_SKIP_TAGS = frozenset({"script", "style", "nav", "footer", "header"})
+
+
+class _TextExtractor:
+    """lxml parser target that collects visible page text, skipping _SKIP_TAGS subtrees.
+
+    libxml2 parses the page chunk by chunk while it downloads and calls back
+    into this target; `full` turns true once enough text has been collected,
+    so the caller can stop reading. The parser's close() returns get_text().
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts = []
+        self.length = 0
+        self._skip_depth = 0
+        # A text node can arrive split across fed chunks; join it before stripping
+        self._pending = []
+        self._pending_length = 0
+
+    @property
+    def full(self) -> bool:
+        # length counts one separator per part; the joined text is one shorter
+        return self.length - 1 > self.limit
+
+    def _flush_text(self):
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending.clear()
+            self._pending_length = 0
+            if text:
+                self.parts.append(text)
+                self.length += len(text) + 1
 
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-                    results.append(f"**{title}**\n{snippet}\n")
+    def start(self, tag, attrib):
+        self._flush_text()
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
 
-            return "\n".join(results) if results else "No results found"
-        except Exception as e:
-            return f"Search error: {str(e)}"
+    def end(self, tag):
+        self._flush_text()
+        if tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def comment(self, text):
+        self._flush_text()
+
+    def data(self, data):
+        if not self._skip_depth and not self.full:
+            self._pending.append(data)
+            self._pending_length += len(data)
+            # A single huge text node would otherwise be buffered whole until
+            # its closing tag; collect it as soon as it alone fills the limit.
+            # Only trailing text past the limit is lost, which get_text cuts anyway
+            if self.length + self._pending_length > self.limit:
+                text = "".join(self._pending).strip()
+                if self.length + len(text) > self.limit:
+                    self._pending = [text]
+                    self._flush_text()
+
+    def close(self) -> str:
+        self._flush_text()
+        return self.get_text()
+
+    def get_text(self) -> str:
+        text = "\n".join(self.parts)
+        if len(text) > self.limit:
+            text = text[:self.limit] + "\n\n... [truncated]"
+        return text
 
 
 async def fetch_url(url: str) -> str:
     """Fetch and extract text content from a URL."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                url,
-                headers={"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"},
-                timeout=15.0,
-                follow_redirects=True
-            )
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
-
-            text = soup.get_text(separator="\n", strip=True)
-            # Limit content
-            if len(text) > 5000:
-                text = text[:5000] + "\n\n... [truncated]"
-            return text
-        except Exception as e:
-            return f"Fetch error: {str(e)}"
-
-
-# Tool definitions for Claude API
-TOOLS = [
+    client = get_client()
+    try:
+        extractor = _TextExtractor(FETCH_TEXT_LIMIT)
+        async with client.stream("GET", url, follow_redirects=True) as response:
+            # Count raw bytes for the cap and decode them as httpx would for .text
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            parser = etree.HTMLParser(target=extractor)
+            # Start the feed so an empty body closes to "" instead of raising
+            parser.feed("")
+            # Parse while downloading; stop once there is enough text or the
+            # byte cap is hit (script-heavy pages can be mostly non-text)
+            received = 0
+            async for chunk in response.aiter_bytes(chunk_size=8192):
+                parser.feed(decoder.decode(chunk))
+                received += len(chunk)
+                if extractor.full or received >= FETCH_BYTE_LIMIT:
+                    break
+            parser.feed(decoder.decode(b"", final=True))
+        return parser.close()
+    except Exception as e:
+        return f"Fetch error: {str(e)}"
+
+
+# Tool definitions for Claude API. A tuple so the one object is passed on
+# every turn unchanged: providers memoize their converted copies of it by
+# identity, so the schemas are converted once per run
+TOOLS = (
     {
         "name": "read_file",
         "description": "Read the contents of a file from the project. Use this to examine existing code, components, styles, or config files.",
@@ -140,7 +375,7 @@ TOOLS = [
     },
     {
         "name": "list_files",
-        "description": "List files in a directory. Use this to understand project structure before reading specific files. Automatically skips node_modules, .git, etc.",
+        "description": "List files in a directory. Use this to understand project structure before reading specific files. Automatically skips node_modules, .git, etc. Returns at most the first 50 paths in sorted order.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -150,7 +385,7 @@ TOOLS = [
                 },
                 "extension": {
                     "type": "string",
-                    "description": "Optional file extension filter (e.g., '.tsx', '.css', '.js')"
+                    "description": "Optional file extension filter (e.g., '.tsx', '.css', '.js'); matches the end of the file name, so '.test.ts' also works"
                 }
             },
             "required": ["directory"]
@@ -201,5 +436,91 @@ TOOLS = [
             },
             "required": ["url"]
         }
+    },
+    {
+        "name": "fetch_urls",
+        "description": "Fetch and read the text content of several URLs at once, in parallel. Prefer this over repeated fetch_url calls when you already know which pages you want to read. Takes at most 5 URLs; each page is shortened to its share of the result budget.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "urls": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "maxItems": 5,
+                    "description": "The URLs to fetch"
+                }
+            },
+            "required": ["urls"]
+        }
+    }
+)
+
+
+# JSON Schema type -> Python type(s) accepted for tool inputs
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def _compile_validator(schema: dict):
+    """Compile a tool input_schema into a function returning an error message or None."""
+    required = tuple(schema.get("required", ()))
+    property_types = {
+        name: (prop.get("type", "string"), _JSON_TYPES[prop.get("type", "string")])
+        for name, prop in schema.get("properties", {}).items()
+    }
+    item_types = {
+        name: (prop["items"].get("type", "string"), _JSON_TYPES[prop["items"].get("type", "string")])
+        for name, prop in schema.get("properties", {}).items()
+        if prop.get("type") == "array" and "items" in prop
     }
-]
+    item_bounds = {
+        name: (prop.get("minItems", 0), prop.get("maxItems"))
+        for name, prop in schema.get("properties", {}).items()
+        if "minItems" in prop or "maxItems" in prop
+    }
+
+    def validate(input_data) -> Optional[str]:
+        if not isinstance(input_data, dict):
+            return "input must be a JSON object"
+        missing = [name for name in required if name not in input_data]
+        if missing:
+            return f"missing required field(s): {', '.join(missing)}"
+        for name, value in input_data.items():
+            if name not in property_types:
+                continue
+            # Models sometimes send null for optional fields; treat as omitted
+            if value is None and name not in required:
+                continue
+            type_name, expected = property_types[name]
+            if not isinstance(value, expected) or (isinstance(value, bool) and type_name in ("integer", "number")):
+                return f"field '{name}' must be of type {type_name}"
+            if name in item_types:
+                item_type_name, item_expected = item_types[name]
+                if not all(isinstance(item, item_expected) for item in value):
+                    return f"field '{name}' must be an array of {item_type_name}"
+            if name in item_bounds:
+                min_items, max_items = item_bounds[name]
+                if len(value) < min_items:
+                    return f"field '{name}' must have at least {min_items} item(s)"
+                if max_items is not None and len(value) > max_items:
+                    return f"field '{name}' must have at most {max_items} items"
+        return None
+
+    return validate
+
+
+# Compiled once at import; checked before a tool runs
+VALIDATORS = {tool["name"]: _compile_validator(tool["input_schema"]) for tool in TOOLS}
+
+
+def validate_tool_input(name: str, input_data) -> Optional[str]:
+    """Return an error message if input_data doesn't match the tool's schema, else None."""
+    validator = VALIDATORS.get(name)
+    return validator(input_data) if validator else None